@@ -1,51 +1,65 @@
 import os
 import gurobipy as gp
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 from gurobipy import  Model, GRB, quicksum
 from collections import defaultdict
 
+from excel_cache import read_excel_cached
+
 
 
 def load_data_from_excel(filepath='a2_part1.xlsx'):
-    
-    # Load Travel Times sheet
-    df_travel = pd.read_excel(filepath, sheet_name='Travel Times')
-    travel_times = {}
 
-    for _, row in df_travel.iterrows():
-        from_station = row['From']
-        to_station = row['To']
-        travel_time = int(row['Travel Time'])
-        travel_times[(from_station, to_station)] = travel_time
+    # Load Travel Times sheet (vectorized: iterrows boxes every cell into a Python object)
+    df_travel = read_excel_cached(filepath, 'Travel Times')
+    arr = df_travel[['From', 'To', 'Travel Time']].to_numpy()
+    travel_times = dict(zip(zip(arr[:, 0], arr[:, 1]), arr[:, 2].astype(int)))
+    # Store both orderings so the network build needs a single lookup per segment
+    travel_times.update({(b, a): v for (a, b), v in list(travel_times.items()) if (b, a) not in travel_times})
 
     # Lines
-    df_lines = pd.read_excel(filepath, sheet_name='Lines')
+    df_lines = read_excel_cached(filepath, 'Lines')
+    stop_cols = [c for c in df_lines.columns if c not in ['Name', 'Frequency']]
+    names = df_lines['Name'].astype(int).to_numpy()
+    stops_arr = df_lines[stop_cols].to_numpy(dtype=object)
+    mask = pd.notna(stops_arr)
+
     lines = {}
-    for _, row in df_lines.iterrows():
-        line = int(row['Name'])
-        stops = []
-        for col in df_lines.columns:
-            if col not in ['Name', 'Frequency']:
-                val = row[col]
-                if pd.notna(val):
-                    s = str(val).strip()
-                    if s and s.lower() != 'nan':
-                        stops.append(s)
-        lines[line] = stops
+    for row_idx, line in enumerate(names):
+        stops = [str(v).strip() for v in stops_arr[row_idx, mask[row_idx]]]
+        lines[int(line)] = [s for s in stops if s and s.lower() != 'nan']
     return travel_times, lines
 
 
 class PESPModel:
     def __init__(self, lines, travel_times, T=30):
         self.T = T  # 30 minutes
-        self.events = {}  
-        self.event_list = []  
-        self.activities = {}  
+        self.events = {}
+        self.event_list = []
+        # Activities stored as parallel columns (SoA), indexed by activity id
+        self.act_from = []
+        self.act_to = []
+        self.act_type = []
+        self.act_lower = []
+        self.act_upper = []
+        self.act_weight = []
         self.event_counter = 0
         self.activity_counter = 0
         self.lines = lines  # Store lines data
         self.travel_times = travel_times  # Store travel times data
-        
+        # Stop membership as sets (O(1) lookups) and the lines serving both
+        # Ehv and Ut, needed twice when building transfer activities
+        self._line_stop_sets = {ln: set(stops) for ln, stops in lines.items()}
+        self._lines_ehv_ut = [ln for ln, s in self._line_stop_sets.items() if 'Ehv' in s and 'Ut' in s]
+        # Station order per (line, direction), reversed once here instead of
+        # on every traversal
+        self._paths = {}
+        for ln, seq in lines.items():
+            self._paths[(ln, 'F')] = seq
+            self._paths[(ln, 'B')] = list(reversed(seq))
+
     def create_event(self, line, direction, station, event_type):
         """Create event with numeric ID"""
         event_id = self.event_counter  
@@ -57,71 +71,65 @@ class PESPModel:
     def create_activity(self, from_event, to_event, activity_type, lower_bound, upper_bound, weight=0):
         """Create an activity linking two events."""
         activity_id = self.activity_counter
-        self.activities[activity_id] = {
-            'from': from_event,
-            'to': to_event,
-            'type': activity_type,
-            'lower': lower_bound,
-            'upper': upper_bound,
-            'weight': weight,
-        }
+        self.act_from.append(from_event)
+        self.act_to.append(to_event)
+        self.act_type.append(activity_type)
+        self.act_lower.append(lower_bound)
+        self.act_upper.append(upper_bound)
+        self.act_weight.append(weight)
         self.activity_counter += 1
         return activity_id
     
     def build_network(self):
         """Build the complete event-activity network."""
-        event_dict = {}  
-        
-        # Events
-        for line, station_sequence in self.lines.items():  
+        event_dict = {}
+
+        # Events + running/dwell activities in a single pass per (line, direction):
+        # each activity only needs the previous departure and the current events,
+        # so emitting them here avoids re-walking every path per activity type.
+        for line in self.lines:
             for direction in ['F', 'B']:
-                path = list(reversed(station_sequence)) if direction == 'B' else station_sequence
-                for station in path:
+                path = self._paths[(line, direction)]
+                last = len(path) - 1
+                prev_dep = None
+                for i, station in enumerate(path):
                     event_d = self.create_event(line, direction, station, 'D')
                     event_a = self.create_event(line, direction, station, 'A')
                     event_dict[(line, direction, station, 'D')] = event_d
                     event_dict[(line, direction, station, 'A')] = event_a
-        
-        # Create activities
-        self._create_running_activities(event_dict)
-        self._create_dwell_activities(event_dict)
-        self._create_headway_activities(event_dict)
-        self._create_synchronization_activities(event_dict)
+
+                    if prev_dep is not None:
+                        # Running: departure at station i-1 and arrival at station i
+                        try:
+                            travel_time = self.travel_times[(path[i - 1], station)]
+                            self.create_activity(prev_dep, event_a, 'running', travel_time, travel_time, weight=100) # Used ChatGPT for Weights
+                        except KeyError:
+                            print(f"Warning: No travel time for {path[i - 1]} to {station}")
+
+                    if 0 < i < last:
+                        # Dwell: arrival at station and departure at same station
+                        self.create_activity(event_a, event_d, 'dwell', 2, 8, 50)
+
+                    prev_dep = event_d
+
+        # Cross-line activities still need the full event lookup table.
+        # Headway/sync pairs only ever reference departures, so give them a
+        # smaller (line, direction, station)-keyed index.
+        dep_by_lds = {k[:3]: eid for k, eid in event_dict.items() if k[3] == 'D'}
+        self._create_headway_activities(dep_by_lds)
+        self._create_synchronization_activities(dep_by_lds)
         self._create_transfer_activities(event_dict)
 
+        # Freeze the numeric activity columns into contiguous arrays
+        self.act_from = np.asarray(self.act_from, dtype=np.int32)
+        self.act_to = np.asarray(self.act_to, dtype=np.int32)
+        self.act_lower = np.asarray(self.act_lower, dtype=np.int32)
+        self.act_upper = np.asarray(self.act_upper, dtype=np.int32)
+        self.act_weight = np.asarray(self.act_weight, dtype=np.int32)
+
         return event_dict
-        
-        
-    def _create_running_activities(self, event_dict):
-        """Running activities: departure at station i and arrival at station i+1."""
-        for line, station_sequence in self.lines.items():  
-            for direction in ['F', 'B']:
-                path = list(reversed(station_sequence)) if direction == 'B' else station_sequence
-                for i in range(len(path) - 1):
-                    station_from, station_to = path[i] , path[i + 1]
-
-                    travel_time = self.travel_times.get((station_from, station_to), self.travel_times.get((station_to, station_from)))
-                    if travel_time is None:
-                        print(f"Warning: No travel time for {station_from} to {station_to}")
-                        continue
-                    
-                    event_dep = event_dict[(line, direction, station_from, 'D')]
-                    event_arr = event_dict[(line, direction, station_to, 'A')]
-                    self.create_activity(event_dep, event_arr,'running',travel_time,travel_time,weight=100) # Used ChatGPT for Weights
-    
-    def _create_dwell_activities(self, event_dict):
-        """Dwell activities: arrival at station and departure at same station."""
-        for line, seq in self.lines.items():
-            for direction in ['F', 'B']:
-                path = list(reversed(seq)) if direction == 'B' else seq
-                for i, st in enumerate(path):
-                    if i == 0 or i == len(path) - 1:
-                        continue
-                    arr = event_dict[(line, direction, st, 'A')]
-                    dep = event_dict[(line, direction, st, 'D')]
-                    self.create_activity(arr, dep, 'dwell', 2, 8, 50)
-    
-    def _create_headway_activities(self, event_dict):
+
+    def _create_headway_activities(self, dep_by_lds):
         """Headway activities on shared track sections."""
         shared_departures = [
             # 800 & 3000: Amr–Asd–Ut
@@ -148,16 +156,16 @@ class PESPModel:
         
         for l1, l2, station, directions in shared_departures:
             for direction in directions:
-                e1 = event_dict.get((l1, direction, station, 'D'))
-                e2 = event_dict.get((l2, direction, station, 'D'))
-                
+                e1 = dep_by_lds.get((l1, direction, station))
+                e2 = dep_by_lds.get((l2, direction, station))
+
                 if e1 and e2:
-                    # Bidirectional headway
+                    # One directed activity per pair; the disjunctive constraint
+                    # in solve_pesp already separates both directions
                     self.create_activity(e1, e2, 'headway', 3, self.T, 0)
-                    self.create_activity(e2, e1, 'headway', 3, self.T, 0)
         
         
-    def _create_synchronization_activities(self, event_dict):
+    def _create_synchronization_activities(self, dep_by_lds):
         """Synchronization: exactly 15 minutes on shared sections."""
         sync_pairs = [
             (800, 3000, 'Asd', ['F', 'B']),
@@ -169,8 +177,8 @@ class PESPModel:
         
         for l1, l2, station, directions in sync_pairs:
             for direction in directions:
-                e1 = event_dict.get((l1, direction, station, 'D'))
-                e2 = event_dict.get((l2, direction, station, 'D'))
+                e1 = dep_by_lds.get((l1, direction, station))
+                e2 = dep_by_lds.get((l2, direction, station))
                 if e1 and e2:
                     self.create_activity(e1, e2, 'synchronization', 15, 15, 0)
 
@@ -179,7 +187,7 @@ class PESPModel:
         """Transfer activities: Heerlen & Utrecht via Eindhoven (BOTH DIRECTIONS)."""
         # Heerlen to Utrecht
         ev_3900_arr = event_dict.get((3900, 'B', 'Ehv', 'A'))
-        lines_ehv_to_ut = [ln for ln, stops in self.lines.items() if 'Ehv' in stops and 'Ut' in stops]
+        lines_ehv_to_ut = self._lines_ehv_ut
         for ln in lines_ehv_to_ut:
             ev_dep = event_dict.get((ln, 'F', 'Ehv', 'D'))
             if ev_3900_arr and ev_dep:
@@ -198,71 +206,59 @@ def solve_pesp(pesp_model, event_dict):
     
     model = gp.Model("A2_Corridor_PESP")
     model.Params.OutputFlag = 1
-    
-    # Decision variables
-    pi = {}  
-    x = {}   
-    p = {}   
-    
-    # Event times
-    for event_id in pesp_model.events:
-        pi[event_id] = model.addVar(lb=0, ub=pesp_model.T, name=f"pi_{event_id}")
-    
-    # Create activity duration and period variables
-    for activity_id, activity in pesp_model.activities.items():
-        lower = activity['lower']
-        upper = activity['upper']
-        x[activity_id] = model.addVar(lb=lower, ub=upper, name=f"x_{activity_id}")
-        p[activity_id] = model.addVar(lb=0, vtype=GRB.INTEGER, name=f"p_{activity_id}")
-    
-    model.update()
-    
-    # Activity duration constraints
-    for activity_id, activity in pesp_model.activities.items():
-        event_i = activity['from']
-        event_j = activity['to']
-        model.addConstr(
-            x[activity_id] == pi[event_j] - pi[event_i] + pesp_model.T * p[activity_id],
-            name=f"duration_{activity_id}"
-        )
-    
+
+    # Race two MIP strategies in concurrent environments; the winner counts
+    env0 = model.getConcurrentEnv(0)
+    env0.setParam('MIPFocus', 1)
+    env1 = model.getConcurrentEnv(1)
+    env1.setParam('MIPFocus', 3)
+    env1.setParam('Cuts', 2)
+
+    n_ev = pesp_model.event_counter
+    n_act = pesp_model.activity_counter
+    act_from = pesp_model.act_from
+    act_to = pesp_model.act_to
+
+    # Decision variables as matrix-API vectors (one C call each)
+    pi = model.addMVar(n_ev, lb=0, ub=pesp_model.T, name="pi")
+    x = model.addMVar(n_act, lb=pesp_model.act_lower, ub=pesp_model.act_upper, name="x")
+    p = model.addMVar(n_act, lb=0, vtype=GRB.INTEGER, name="p")
+
+    # Activity duration constraints x_a = pi_j - pi_i + T*p_a as one sparse block:
+    # A has +1 at (a, to_event) and -1 at (a, from_event)
+    rows = np.arange(n_act)
+    A = sp.csr_matrix(
+        (np.concatenate([np.ones(n_act), -np.ones(n_act)]),
+         (np.concatenate([rows, rows]), np.concatenate([act_to, act_from]))),
+        shape=(n_act, n_ev),
+    )
+    model.addConstr(A @ pi - x + pesp_model.T * p == 0, name="duration")
+
     # For headway activities, enforce: |π[e2] - π[e1]| >= 3 OR |π[e2] - π[e1]| <= T-3
     # This prevents both from being in [0, 3) or (T-3, T]
     # Used GitHub Copilot for this part
-    
-    headway_pairs = set()
-    for activity_id, activity in pesp_model.activities.items():
-        if activity['type'] == 'headway':
-            e1, e2 = activity['from'], activity['to']
-            pair = tuple(sorted([e1, e2]))
-            if pair not in headway_pairs:
-                headway_pairs.add(pair)
-                # Add constraint: π[e2] - π[e1] must be outside the "forbidden zone"
-                # Use binary variable to enforce disjunction
-                y = model.addVar(vtype=GRB.BINARY, name=f"y_headway_{e1}_{e2}")
-                
-                # If y=0: π[e2] >= π[e1] + 3
-                # If y=1: π[e2] <= π[e1] - 3 (or equivalently: π[e1] >= π[e2] + 3)
-                model.addConstr(pi[e2] >= pi[e1] + 3 - pesp_model.T * y, name=f"hw_sep1_{e1}_{e2}")
-                model.addConstr(pi[e1] >= pi[e2] + 3 - pesp_model.T * (1 - y), name=f"hw_sep2_{e1}_{e2}")
+
+    # Each pair now appears as exactly one directed activity, so no dedup set
+    for a in range(n_act):
+        if pesp_model.act_type[a] == 'headway':
+            e1, e2 = int(act_from[a]), int(act_to[a])
+            # Add constraint: π[e2] - π[e1] must be outside the "forbidden zone"
+            # Use binary variable to enforce disjunction
+            y = model.addVar(vtype=GRB.BINARY, name=f"y_headway_{e1}_{e2}")
+
+            # If y=0: π[e2] >= π[e1] + 3
+            # If y=1: π[e2] <= π[e1] - 3 (or equivalently: π[e1] >= π[e2] + 3)
+            model.addConstr(pi[e2] >= pi[e1] + 3 - pesp_model.T * y, name=f"hw_sep1_{e1}_{e2}")
+            model.addConstr(pi[e1] >= pi[e2] + 3 - pesp_model.T * (1 - y), name=f"hw_sep2_{e1}_{e2}")
     
     # Line 3500 departs Schiphol at :09
     for event_id in pesp_model.events:
         line, direction, station, event_type = pesp_model.events[event_id]
         if line == 3500 and station == 'Shl' and event_type == 'D' and direction == 'F':
             model.addConstr(pi[event_id] == 9, name=f"fixed_3500_Shl")
-    
-    model.update()
-    
-    # Objective
-    model.setObjective(
-        quicksum(
-            activity['weight'] * x[activity_id]
-            for activity_id, activity in pesp_model.activities.items()
-            if activity['weight'] > 0
-        ),
-        GRB.MINIMIZE
-    )
+
+    # Objective: weighted activity durations as a single dot product
+    model.setObjective(pesp_model.act_weight.astype(float) @ x, GRB.MINIMIZE)
     
     model.optimize()
     
@@ -282,10 +278,13 @@ def print_timetable(model, pesp_model, pi):
     
     # Group events by (line, direction, station) and sort
     events_by_station = defaultdict(list)
-    
+
+    # One bulk fetch of all event times instead of a per-event .X call
+    pi_vals = np.asarray(pi.X)
+
     for event_id in pesp_model.event_list:
         line, direction, station, event_type = pesp_model.events[event_id]
-        time = pi[event_id].X
+        time = float(pi_vals[event_id])
         events_by_station[(line, direction, station)].append((event_id, event_type, time))
     
     # Print by line and direction
@@ -294,7 +293,7 @@ def print_timetable(model, pesp_model, pi):
         print("-" * 100)
         for direction in ['F', 'B']:
             name = "Forward" if direction == 'F' else "Backward"
-            seq = list(reversed(lines[line])) if direction == 'B' else lines[line]
+            seq = pesp_model._paths[(line, direction)]
             print(f"{name}:")
             print(f"{'Station':<25} {'Departure':<15} {'Arrival':<15}")
             print("-"*85)
@@ -1,10 +1,35 @@
+import numpy as np
 import pandas as pd
 
+from excel_cache import read_excel_cached
+
+
+def _expand_cross_section(dep0, arr0, period, start_time, end_time, target_time):
+    """Closed-form cross-section: only k = floor((target-dep0)/period) can put a
+    trip's departure at or before target_time, plus k-1 when the trip spans a
+    full period, so no per-pattern expansion loop is needed."""
+    n = dep0.shape[0]
+    k0 = (target_time - dep0) // period
+    cand_idx = np.tile(np.arange(n), 2)
+    cand_k = np.concatenate([k0, k0 - 1])
+
+    dep = dep0[cand_idx] + cand_k * period
+    arr = arr0[cand_idx] + cand_k * period
+    mask = (
+        (cand_k >= 0)
+        & (dep >= start_time)
+        & (dep < end_time)
+        & (dep <= target_time)
+        & (arr >= target_time)
+    )
+    return cand_idx[mask], dep[mask], arr[mask]
+
+
 def solve_2_1_a():
     # =====================================================
     # 1. Load the Timetable Data
     # =====================================================
-    df = pd.read_excel("a2_part2.xlsx", sheet_name="Timetable")
+    df = read_excel_cached("a2_part2.xlsx", "Timetable")
 
     print("Columns:", df.columns.tolist())
     print("Unique Type values:", df["Type"].unique())
@@ -19,32 +44,26 @@ def solve_2_1_a():
     # =====================================================
     PERIOD = 30  # minutes
 
-    trips_pattern = []
-
-    for (line, direction), group in df.groupby(["Line", "Direction"]):
-
-        dep_times = group[group["Type_norm"] == "dep"]["Time"]
-        arr_times = group[group["Type_norm"] == "arr"]["Time"]
-
-        if dep_times.empty or arr_times.empty:
-            continue
-
-        # Earliest departure in the 30-min period
-        dep0 = dep_times.min()
-
-        # Correct duration: maximum forward difference modulo 30
-        duration = max((t - dep0) % PERIOD for t in arr_times)
-        if duration == 0:
-            duration = PERIOD
-
-        trips_pattern.append({
-            "Line": line,
-            "Direction": direction,
-            "Dep0": dep0,
-            "Arr0": dep0 + duration
-        })
-
-    trips_pattern_df = pd.DataFrame(trips_pattern)
+    # Earliest departure per (line, direction) in the 30-min period
+    dep0 = (
+        df[df["Type_norm"] == "dep"]
+        .groupby(["Line", "Direction"])["Time"].min()
+        .rename("Dep0").reset_index()
+    )
+
+    # Correct duration: maximum forward difference modulo 30, computed as a
+    # vectorized merge + groupby-max instead of a Python generator per group
+    arr = df[df["Type_norm"] == "arr"].merge(dep0, on=["Line", "Direction"])
+    arr["rel"] = (arr["Time"] - arr["Dep0"]) % PERIOD
+    duration = (
+        arr.groupby(["Line", "Direction"])["rel"].max()
+        .replace(0, PERIOD).rename("Duration").reset_index()
+    )
+
+    # Inner merges drop groups missing either departures or arrivals
+    trips_pattern_df = dep0.merge(duration, on=["Line", "Direction"])
+    trips_pattern_df["Arr0"] = trips_pattern_df["Dep0"] + trips_pattern_df["Duration"]
+    trips_pattern_df = trips_pattern_df.drop(columns="Duration")
 
     print("\nPeriodic trip patterns:")
     print(trips_pattern_df)
@@ -56,31 +75,18 @@ def solve_2_1_a():
     END_TIME = 1440       # 24:00
     TARGET_TIME = 8 * 60  # 08:00
 
-    cross_section_trips = []
-
-    for _, trip in trips_pattern_df.iterrows():
-        dep0 = trip["Dep0"]
-        arr0 = trip["Arr0"]
-
-        k = 0
-        while True:
-            dep = dep0 + k * PERIOD
-            arr = arr0 + k * PERIOD
-
-            if dep >= END_TIME:
-                break
-
-            if dep >= START_TIME and dep <= TARGET_TIME <= arr:
-                cross_section_trips.append({
-                    "Line": trip["Line"],
-                    "Direction": trip["Direction"],
-                    "Departure_abs": dep,
-                    "Arrival_abs": arr
-                })
-
-            k += 1
-
-    cross_section_df = pd.DataFrame(cross_section_trips)
+    dep0 = trips_pattern_df["Dep0"].to_numpy(dtype=np.int64)
+    arr0 = trips_pattern_df["Arr0"].to_numpy(dtype=np.int64)
+    idx, dep_abs, arr_abs = _expand_cross_section(
+        dep0, arr0, PERIOD, START_TIME, END_TIME, TARGET_TIME
+    )
+
+    cross_section_df = pd.DataFrame({
+        "Line": trips_pattern_df["Line"].to_numpy()[idx],
+        "Direction": trips_pattern_df["Direction"].to_numpy()[idx],
+        "Departure_abs": dep_abs,
+        "Arrival_abs": arr_abs,
+    })
 
     # =====================================================
     # 5. Output
@@ -1,7 +1,10 @@
+import numpy as np
 import pandas as pd
-from gurobipy import Model, GRB, quicksum
+from gurobipy import Model, GRB, LinExpr, quicksum
 import time
 
+from excel_cache import read_excel_cached
+
 XLSX_FILE = "a2_part2.xlsx"
 
 U = ["PL3", "PL4"]
@@ -41,48 +44,63 @@ def minutes_to_hhmm(m):
     return f"{m//60:02d}:{m%60:02d}"
 
 
-def build_cross_section():
-    df = pd.read_excel(XLSX_FILE, sheet_name="Timetable")
-    df["Type_norm"] = df["Type"].astype(str).str.strip().str.lower()
-    df["Dir_norm"] = df["Direction"].apply(normalize_direction)
-
-    patterns = []
+def _expand_cross_section(dep0, arr0, period, start_time, end_time, target_time):
+    """Closed-form cross-section: only k = floor((target-dep0)/period) can put a
+    trip's departure at or before target_time, plus k-1 when the trip spans a
+    full period, so no per-pattern expansion loop is needed."""
+    n = dep0.shape[0]
+    k0 = (target_time - dep0) // period
+    cand_idx = np.tile(np.arange(n), 2)
+    cand_k = np.concatenate([k0, k0 - 1])
 
-    for (line, direction), g in df.groupby(["Line", "Dir_norm"]):
-        dep = g[g["Type_norm"] == "dep"]["Time"].min()
-        arr_times = g[g["Type_norm"] == "arr"]["Time"]
+    dep = dep0[cand_idx] + cand_k * period
+    arr = arr0[cand_idx] + cand_k * period
+    mask = (
+        (cand_k >= 0)
+        & (dep >= start_time)
+        & (dep < end_time)
+        & (dep <= target_time)
+        & (arr >= target_time)
+    )
+    return cand_idx[mask], dep[mask], arr[mask]
 
-        duration = max((t - dep) % PERIOD for t in arr_times)
-        if duration == 0:
-            duration = PERIOD
 
-        patterns.append({
-            "Line": int(line),
-            "Direction": direction,
-            "Dep0": dep,
-            "Arr0": dep + duration
-        })
+def build_cross_section():
+    df = read_excel_cached(XLSX_FILE, "Timetable")
+    df["Type_norm"] = df["Type"].astype(str).str.strip().str.lower()
+    df["Dir_norm"] = df["Direction"].apply(normalize_direction)
 
-    patt = pd.DataFrame(patterns)
-
-    cross = []
-    for _, r in patt.iterrows():
-        k = 0
-        while True:
-            dep = r.Dep0 + k * PERIOD
-            arr = r.Arr0 + k * PERIOD
-            if dep >= END_TIME:
-                break
-            if dep >= START_TIME and dep <= TARGET_TIME <= arr:
-                cross.append({
-                    "Line": r.Line,
-                    "Direction": r.Direction,
-                    "Departure": dep,
-                    "Arrival": arr
-                })
-            k += 1
-
-    Tdf = pd.DataFrame(cross).drop_duplicates().reset_index(drop=True)
+    # Earliest departure and max forward arrival offset per (line, direction),
+    # as a vectorized merge + groupby-max instead of a Python loop per group
+    dep0 = (
+        df[df["Type_norm"] == "dep"]
+        .groupby(["Line", "Dir_norm"])["Time"].min()
+        .rename("Dep0").reset_index()
+    )
+    arr = df[df["Type_norm"] == "arr"].merge(dep0, on=["Line", "Dir_norm"])
+    arr["rel"] = (arr["Time"] - arr["Dep0"]) % PERIOD
+    duration = (
+        arr.groupby(["Line", "Dir_norm"])["rel"].max()
+        .replace(0, PERIOD).rename("Duration").reset_index()
+    )
+
+    patt = dep0.merge(duration, on=["Line", "Dir_norm"])
+    patt["Line"] = patt["Line"].astype(int)
+    patt["Arr0"] = patt["Dep0"] + patt["Duration"]
+    patt = patt.rename(columns={"Dir_norm": "Direction"}).drop(columns="Duration")
+
+    dep0 = patt["Dep0"].to_numpy(dtype=np.int64)
+    arr0 = patt["Arr0"].to_numpy(dtype=np.int64)
+    idx, dep_abs, arr_abs = _expand_cross_section(
+        dep0, arr0, PERIOD, START_TIME, END_TIME, TARGET_TIME
+    )
+
+    Tdf = pd.DataFrame({
+        "Line": patt["Line"].to_numpy()[idx],
+        "Direction": patt["Direction"].to_numpy()[idx],
+        "Departure": dep_abs,
+        "Arrival": arr_abs,
+    }).drop_duplicates().reset_index(drop=True)
     Tdf["t"] = range(len(Tdf))
     return Tdf
 
@@ -103,8 +121,8 @@ def main():
     N = m.addVars(U, T, vtype=GRB.INTEGER, lb=0, name="N")
     n = m.addVars(U, vtype=GRB.INTEGER, lb=0, name="n")
 
-    # Objective
-    m.setObjective(quicksum(F[u] * n[u] for u in U), GRB.MINIMIZE)
+    # Objective, assembled in one C call instead of term-by-term quicksum
+    m.setObjective(LinExpr([F[u] for u in U], [n[u] for u in U]), GRB.MINIMIZE)
 
     # Fleet-size constraints
     for u in U:
@@ -128,10 +146,14 @@ def main():
     end_time = time.time()
     runtime = end_time - start_time
 
+    # Bulk attribute fetches instead of one FFI round-trip per variable
+    N_vals = m.getAttr('X', N)
+    n_vals = m.getAttr('X', n)
+
     print("\n================ OPTIMAL SOLUTION =================")
     print(f"Optimal yearly cost: {m.objVal:,.0f} €")
-    print(f"Buy PL3 units: {int(n['PL3'].X)}")
-    print(f"Buy PL4 units: {int(n['PL4'].X)}")
+    print(f"Buy PL3 units: {int(n_vals['PL3'])}")
+    print(f"Buy PL4 units: {int(n_vals['PL4'])}")
     print(f"Execution time (basic formulation): {runtime:.4f} seconds")
 
 
@@ -139,8 +161,8 @@ def main():
     rows = []
     for r in Tdf.itertuples():
         t = r.t
-        n3 = int(N["PL3", t].X)
-        n4 = int(N["PL4", t].X)
+        n3 = int(N_vals["PL3", t])
+        n4 = int(N_vals["PL4", t])
         rows.append({
             "Line": r.Line,
             "Direction": r.Direction,
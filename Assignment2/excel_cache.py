@@ -0,0 +1,25 @@
+import os
+
+import pandas as pd
+
+
+def read_excel_cached(xlsx_path, sheet_name):
+    """Read an Excel sheet through a Parquet cache.
+
+    openpyxl parses the xlsx XML on every read, which dominates startup for
+    the scripts that share these workbooks. The first read writes a Parquet
+    copy next to the workbook; later reads (from any script) load that
+    instead, as long as it is newer than the workbook.
+    """
+    base = os.path.splitext(xlsx_path)[0]
+    cache = f"{base}_{sheet_name.replace(' ', '_')}.parquet"
+
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(xlsx_path):
+        return pd.read_parquet(cache)
+
+    df = pd.read_excel(xlsx_path, sheet_name=sheet_name)
+    try:
+        df.to_parquet(cache)
+    except Exception:
+        pass  # no parquet engine installed; keep reading from Excel
+    return df
@@ -1,5 +1,13 @@
 import numpy as np
-import math
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+    prange = range
 
 ROUTES = [
     [0, 1, 11, 22, 7, 14, 25, 0],
@@ -10,12 +18,57 @@ ROUTES = [
 ]
 
 def read_instance(path="instance.txt"):
-    lines = [ln.strip() for ln in open(path) if ln.strip()]
-    Q = int(lines[0])
-    dem = list(map(int, lines[1].split()))  
-    q = np.array([0] + dem, dtype=int)      
+    # Parse in C via fromstring instead of per-token Python loops
+    with open(path, "r") as f:
+        Q = int(f.readline().split()[0])
+        dem = np.fromstring(f.readline(), dtype=np.int32, sep=" ")  # customers 1..n
+
+    q = np.ascontiguousarray(np.concatenate(([0], dem)), dtype=np.int32)  # depot demand = 0
     return Q, q
 
+@njit(parallel=True, cache=True)
+def _violation_kernel(LO, HI1, routes_arr, Q, k, seed):
+    """Sample and evaluate one scenario at a time, keeping only totalV.
+
+    Streams instead of materializing the (k, n) demand and (k, routes)
+    load matrices; scenarios are independent, so the outer loop is a
+    prange. Numba's RNG state is thread-local, so each scenario reseeds
+    with seed + t to stay deterministic regardless of which worker
+    thread runs it. routes_arr holds customer indices padded with -1.
+    """
+    n = LO.shape[0]
+    totalV = np.zeros(k, dtype=np.int64)
+
+    for t in prange(k):
+        np.random.seed(seed + t)
+        q = np.empty(n + 1, dtype=np.int64)
+        q[0] = 0
+        for i in range(n):
+            q[i + 1] = np.random.randint(LO[i], HI1[i])
+
+        V = 0
+        for r_idx in range(routes_arr.shape[0]):
+            load = 0
+            for s in range(routes_arr.shape[1]):
+                node = routes_arr[r_idx, s]
+                if node < 0:
+                    break
+                load += q[node]
+            if load > Q:
+                V += load - Q
+        totalV[t] = V
+
+    return totalV
+
+def _pad_route_customers(routes):
+    """Customer indices per route as a rectangular -1-padded array."""
+    custs = [[c for c in r if c != 0] for r in routes]
+    max_len = max(len(c) for c in custs)
+    routes_arr = np.full((len(custs), max_len), -1, dtype=np.int64)
+    for r_idx, c in enumerate(custs):
+        routes_arr[r_idx, :len(c)] = c
+    return routes_arr
+
 def simulate_12b(routes, Q, q_nominal, k=1000, seed=0):
     """
     Implements 1.2(b):
@@ -23,29 +76,18 @@ def simulate_12b(routes, Q, q_nominal, k=1000, seed=0):
     - compute per-route violation max(0, load - Q)
     - total violation is sum of route violations
     """
-    rng = np.random.default_rng(seed)
-    n = len(q_nominal) - 1  
+    n = len(q_nominal) - 1
 
-    totalV = np.zeros(k, dtype=int)
+    LO = np.floor(0.9 * q_nominal[1:]).astype(np.int64)
+    HI1 = np.ceil(1.1 * q_nominal[1:]).astype(np.int64) + 1
+    routes_arr = _pad_route_customers(routes)
 
-    for t in range(k):
-        # sample demands
-        q_tilde = np.zeros(n + 1, dtype=int)
-        for i in range(1, n + 1):
-            lo = int(math.floor(0.9 * q_nominal[i]))
-            hi = int(math.ceil(1.1 * q_nominal[i]))
-            q_tilde[i] = rng.integers(lo, hi + 1)  
-
-        V = 0
-        for r in routes:
-            cust = [i for i in r if i != 0]
-            load = int(q_tilde[cust].sum())
-            V += max(0, load - Q)
-        totalV[t] = V
+    totalV = _violation_kernel(LO, HI1, routes_arr, Q, k, seed)
 
-    num_violations = int(np.sum(totalV > 0))
-    avg_violation = float(np.mean(totalV))
-    max_violation = int(np.max(totalV))
+    # Single C-level reductions over the kernel's totalV array
+    num_violations = int((totalV > 0).sum())
+    avg_violation = float(totalV.mean())
+    max_violation = int(totalV.max())
 
     return num_violations, avg_violation, max_violation
 
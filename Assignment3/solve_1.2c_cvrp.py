@@ -1,33 +1,37 @@
 import time
-import math
+from collections import defaultdict
 import numpy as np
 import gurobipy as gp
 from gurobipy import GRB
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
 
-def read_instance(path="instance.txt"):
-    lines = [ln.strip() for ln in open(path) if ln.strip()]
-    Q = int(lines[0])
-    dem = list(map(int, lines[1].split()))  # customers 1..n
-    n = len(dem)
 
-    C = []
-    for r in range(n + 1):
-        C.append(list(map(int, lines[2 + r].split())))
-    C = np.array(C, dtype=int)
+def read_instance(path="instance.txt"):
+    # Parse in C via fromstring/loadtxt instead of per-token Python loops
+    with open(path, "r") as f:
+        Q = int(f.readline().split()[0])
+        dem = np.fromstring(f.readline(), dtype=np.int32, sep=" ")  # customers 1..n
+        C = np.ascontiguousarray(np.loadtxt(f, dtype=np.int32))
 
-    q = np.array([0] + dem, dtype=int)  # depot demand = 0
+    q = np.ascontiguousarray(np.concatenate(([0], dem)), dtype=np.int32)  # depot demand = 0
     return Q, q, C
 
 
-def extract_routes_from_x(x, n_customers):
-    N = range(n_customers + 1)
-    succ = {i: [] for i in N}
-
-    for i in N:
-        for j in N:
-            if i != j and x[i, j].X > 0.5:
-                succ[i].append(j)
+def extract_routes_from_x(m, x, n_customers):
+    # One bulk value fetch instead of (n+1)^2 per-variable .X reads,
+    # then only the ~n active arcs are visited
+    vals = m.getAttr('X', x)
+    succ = defaultdict(list)
+    for (i, j), v in vals.items():
+        if i != j and v > 0.5:
+            succ[i].append(j)
 
     routes = []
     for first in succ[0]:
@@ -43,37 +47,63 @@ def extract_routes_from_x(x, n_customers):
     return routes
 
 
-def simulate_k_and_get_worst(routes, Q, q_nominal, k=1000, seed=0):
-    rng = np.random.default_rng(seed)
-    n = len(q_nominal) - 1
+@njit(cache=True)
+def _worst_case_kernel(LO, HI1, routes_arr, Q, k, seed):
+    """Sample and evaluate one scenario at a time, streaming.
 
-    totalV = np.zeros(k, dtype=int)
-    worst_q = None
+    Serial on purpose: tracking the worst scenario and per-route counts
+    needs a deterministic single RNG stream. Only totalV, the counts and
+    one worst_q copy are kept, never a (k, n) demand matrix.
+    """
+    n = LO.shape[0]
+    num_routes = routes_arr.shape[0]
+    totalV = np.zeros(k, dtype=np.int64)
+    route_counts = np.zeros(num_routes, dtype=np.int64)
+    worst_q = np.zeros(n + 1, dtype=np.int64)
     worst_V = -1
 
-    # optional per-route violation counts
-    route_viol_counts = np.zeros(len(routes), dtype=int)
-
+    np.random.seed(seed)
+    q = np.zeros(n + 1, dtype=np.int64)
     for t in range(k):
-        q_tilde = np.zeros(n + 1, dtype=int)
-        for i in range(1, n + 1):
-            lo = int(math.floor(0.9 * q_nominal[i]))
-            hi = int(math.ceil(1.1 * q_nominal[i]))
-            q_tilde[i] = rng.integers(lo, hi + 1)
+        for i in range(n):
+            q[i + 1] = np.random.randint(LO[i], HI1[i])
 
         V = 0
-        for r_idx, r in enumerate(routes):
-            cust = [i for i in r if i != 0]
-            load = int(q_tilde[cust].sum())
-            viol = max(0, load - Q)
-            if viol > 0:
-                route_viol_counts[r_idx] += 1
-            V += viol
-
+        for r_idx in range(num_routes):
+            load = 0
+            for s in range(routes_arr.shape[1]):
+                node = routes_arr[r_idx, s]
+                if node < 0:
+                    break
+                load += q[node]
+            if load > Q:
+                route_counts[r_idx] += 1
+                V += load - Q
         totalV[t] = V
         if V > worst_V:
             worst_V = V
-            worst_q = q_tilde.copy()
+            worst_q[:] = q
+
+    return totalV, worst_q, route_counts
+
+
+def simulate_k_and_get_worst(routes, Q, q_nominal, k=1000, seed=0):
+    n = len(q_nominal) - 1
+
+    LO = np.floor(0.9 * q_nominal[1:]).astype(np.int64)
+    HI1 = np.ceil(1.1 * q_nominal[1:]).astype(np.int64) + 1
+
+    # Customer indices per route as a rectangular -1-padded array
+    custs = [[c for c in r if c != 0] for r in routes]
+    max_len = max(len(c) for c in custs)
+    routes_arr = np.full((len(custs), max_len), -1, dtype=np.int64)
+    for r_idx, c in enumerate(custs):
+        routes_arr[r_idx, :len(c)] = c
+
+    totalV, worst_q, route_viol_counts = _worst_case_kernel(
+        LO, HI1, routes_arr, Q, k, seed
+    )
+    worst_V = int(totalV.max())
 
     numV = int(np.sum(totalV > 0))
     avgV = float(np.mean(totalV))
@@ -89,9 +119,71 @@ def simulate_k_and_get_worst(routes, Q, q_nominal, k=1000, seed=0):
     }
 
 
-def solve_scenario_based_two_index(Q, C, scenarios, K=5, timelimit=600, output=1):
+def _add_capacity_cut(model, comp, load, Q):
+    """Rounded capacity cut x(S,S) <= |S| - ceil(q(S)/Q); with ceil = 1 this is
+    the plain DFJ subtour-elimination inequality."""
+    k_min = max(1, -(-load // Q))
+    x = model._x
+    model.cbLazy(
+        gp.quicksum(x[i, j] for i in comp for j in comp if i != j)
+        <= len(comp) - k_min
+    )
+
+
+def _scenario_cut_callback(model, where):
+    """Lazy DFJ/capacity cuts separated on integer incumbents, with route
+    loads checked under every scenario demand vector."""
+    if where != GRB.Callback.MIPSOL:
+        return
+
+    vals = model.cbGetSolution(model._x)
+    Q = model._Q
+    scenarios = model._scenarios
+    n = model._n
+
+    succ = {}
+    depot_succ = []
+    for (i, j), v in vals.items():
+        if i != j and v > 0.5:
+            if i == 0:
+                depot_succ.append(j)
+            else:
+                succ[i] = j
+
+    visited = set()
+
+    # Depot-rooted routes: cut when the load under some scenario exceeds
+    # capacity; the worst scenario load gives the strongest rounded cut
+    for start in depot_succ:
+        comp = []
+        cur = start
+        while cur != 0 and cur not in visited:
+            visited.add(cur)
+            comp.append(cur)
+            cur = succ.get(cur, 0)
+        load = max(int(q_s[comp].sum()) for q_s in scenarios)
+        if load > Q:
+            _add_capacity_cut(model, comp, load, Q)
+
+    # Any customer not reached from the depot lies on a subtour: always cut
+    for i in range(1, n + 1):
+        if i in visited or i not in succ:
+            continue
+        comp = []
+        cur = i
+        while cur != 0 and cur not in visited:
+            visited.add(cur)
+            comp.append(cur)
+            cur = succ.get(cur, 0)
+        load = max(int(q_s[comp].sum()) for q_s in scenarios)
+        _add_capacity_cut(model, comp, load, Q)
+
+
+def solve_scenario_based_two_index(Q, C, scenarios, K=5, timelimit=600, output=1,
+                                   x_start=None):
     """
     scenarios: list of demand vectors q^s, each length n+1 (q^s[0]=0)
+    x_start: optional {(i, j): value} MIP start from a previous iteration
     """
     n = len(scenarios[0]) - 1
     N = range(n + 1)
@@ -103,35 +195,37 @@ def solve_scenario_based_two_index(Q, C, scenarios, K=5, timelimit=600, output=1
 
     x = m.addVars(N, N, vtype=GRB.BINARY, name="x")
 
-    for i in N:
-        m.addConstr(x[i, i] == 0)
+    if x_start is not None:
+        # Previous iteration's routing as a warm incumbent; Gurobi repairs
+        # or discards it if the newly added scenario makes it infeasible
+        for key, v in x_start.items():
+            x[key].Start = v
 
-    for i in CUST:
-        m.addConstr(gp.quicksum(x[i, j] for j in N if j != i) == 1)
-        m.addConstr(gp.quicksum(x[j, i] for j in N if j != i) == 1)
+    m.addConstrs((x[i, i] == 0 for i in N), name="noself")
 
-    m.addConstr(gp.quicksum(x[0, j] for j in CUST) == K)
-    m.addConstr(gp.quicksum(x[j, 0] for j in CUST) == K)
+    # Row/column arc lists built once instead of an O(n) scan per constraint
+    out_arcs = {i: [x[i, j] for j in N if j != i] for i in CUST}
+    in_arcs = {i: [x[j, i] for j in N if j != i] for i in CUST}
 
-    u = {}
-    for s_idx, q_s in enumerate(scenarios):
-        for i in CUST:
-            u[s_idx, i] = m.addVar(lb=0.0, ub=float(Q), vtype=GRB.CONTINUOUS, name=f"u[{s_idx},{i}]")
+    m.addConstrs((gp.quicksum(out_arcs[i]) == 1 for i in CUST), name="deg_out")
+    m.addConstrs((gp.quicksum(in_arcs[i]) == 1 for i in CUST), name="deg_in")
 
-        for i in CUST:
-            m.addConstr(u[s_idx, i] >= int(q_s[i]))
-            m.addConstr(u[s_idx, i] <= Q)
-
-        for i in CUST:
-            for j in CUST:
-                if i != j:
-                    # u_i^s - u_j^s + Q*x_ij <= Q - q_j^s
-                    m.addConstr(u[s_idx, i] - u[s_idx, j] + Q * x[i, j] <= Q - int(q_s[j]))
+    m.addConstr(gp.quicksum(x[0, j] for j in CUST) == K)
+    m.addConstr(gp.quicksum(x[j, 0] for j in CUST) == K)
 
     m.setObjective(gp.quicksum(C[i, j] * x[i, j] for i in N for j in N), GRB.MINIMIZE)
 
+    # Subtour/capacity handling via lazy cuts instead of n^2 lifted MTZ rows
+    # replicated per scenario: constraints are only materialized when an
+    # integer incumbent violates them under some scenario
+    m.Params.LazyConstraints = 1
+    m._x = x
+    m._scenarios = scenarios
+    m._Q = Q
+    m._n = n
+
     start = time.time()
-    m.optimize()
+    m.optimize(_scenario_cut_callback)
     end = time.time()
 
     info = {
@@ -149,16 +243,21 @@ def run_cutting_plane(iterations=5, k=1000, seed=0, timelimit=600, K=5, output=1
 
     # scenario set S starts with only nominal q  :contentReference[oaicite:2]{index=2}
     S = [q_nom.copy()]
+    # Raw-byte hashes make the duplicate check O(1) instead of a
+    # np.array_equal scan over the whole scenario set
+    S_hashes = {q_nom.tobytes()}
 
     # store results for reporting
     history = []
+    x_prev = None
 
     for it in range(1, iterations + 1):
         print(f"\n================ 1.2(c) Iteration {it} ================")
         print(f"Scenario set size |S| = {len(S)}")
 
         m, x, solve_info = solve_scenario_based_two_index(
-            Q=Q, C=C, scenarios=S, K=K, timelimit=timelimit, output=output
+            Q=Q, C=C, scenarios=S, K=K, timelimit=timelimit, output=output,
+            x_start=x_prev
         )
 
         print("Solve info:", solve_info)
@@ -166,7 +265,10 @@ def run_cutting_plane(iterations=5, k=1000, seed=0, timelimit=600, K=5, output=1
             print("No feasible solution found. Stopping.")
             break
 
-        routes = extract_routes_from_x(x, n_customers=n)
+        # Warm-start the next iteration from this routing
+        x_prev = m.getAttr('X', x)
+
+        routes = extract_routes_from_x(m, x, n_customers=n)
         print("Routes:")
         for r in routes:
             print(r)
@@ -184,13 +286,14 @@ def run_cutting_plane(iterations=5, k=1000, seed=0, timelimit=600, K=5, output=1
 
         if worst_V > 0:
             # avoid adding duplicates
-            duplicate = any(np.array_equal(worst_q, q_s) for q_s in S)
+            duplicate = worst_q.tobytes() in S_hashes
             print("Most violating scenario total violation:", worst_V)
             print("Most violating scenario demands (customers 1..n):")
             print(worst_q[1:].tolist())
 
             if not duplicate:
                 S.append(worst_q)
+                S_hashes.add(worst_q.tobytes())
                 print("-> Added this scenario to S.")
             else:
                 print("-> Worst scenario already in S; not adding.")
@@ -1,5 +1,4 @@
 import numpy as np
-import math
 
 ROUTES = [
     [0, 1, 11, 22, 7, 14, 25, 0],
@@ -10,41 +9,34 @@ ROUTES = [
 ]
 
 def read_instance(path="instance.txt"):
-    lines = [ln.strip() for ln in open(path) if ln.strip()]
-    Q = int(lines[0])
-    dem = list(map(int, lines[1].split()))
-    n = len(dem)
+    # Parse in C via fromstring/loadtxt instead of per-token Python loops
+    with open(path, "r") as f:
+        Q = int(f.readline().split()[0])
+        dem = np.fromstring(f.readline(), dtype=np.int32, sep=" ")  # customers 1..n
+        C = np.ascontiguousarray(np.loadtxt(f, dtype=np.int32))
 
-    C = []
-    for r in range(n + 1):
-        C.append(list(map(int, lines[2 + r].split())))
-    C = np.array(C, dtype=int)
-
-    q = np.array([0] + dem, dtype=int)
+    q = np.ascontiguousarray(np.concatenate(([0], dem)), dtype=np.int32)  # depot demand = 0
     return Q, q, C
 
-def sample_demands(q_nominal, rng):
-    n = len(q_nominal) - 1
-    q_tilde = np.zeros(n + 1, dtype=int)
-    for i in range(1, n + 1):
-        lo = int(math.floor(0.9 * q_nominal[i]))
-        hi = int(math.ceil(1.1 * q_nominal[i]))
-        q_tilde[i] = rng.integers(lo, hi + 1)
-    return q_tilde
+def _prepare_bounds(q_nominal):
+    """Per-customer sampling bounds; they only depend on the nominal demands."""
+    LO = np.floor(0.9 * q_nominal[1:]).astype(np.int64)
+    HI1 = np.ceil(1.1 * q_nominal[1:]).astype(np.int64) + 1
+    return LO, HI1
 
-def route_violation(route, q_tilde, Q):
-    cust = [i for i in route if i != 0]
-    load = int(q_tilde[cust].sum())
-    return max(0, load - Q), load
+def sample_demands(LO, HI1, rng):
+    return np.concatenate(([0], rng.integers(LO, HI1)))
 
 def apply_refill_recourse(route, q_tilde, Q, C, verbose=False):
     """
     Order-preserving refill recourse.
     Returns: (base_cost, recourse_cost, extra_cost)
     """
-    base_cost = 0
-    for a, b in zip(route[:-1], route[1:]):
-        base_cost += int(C[a, b])
+    # Base cost with one fancy-indexed sum instead of a per-arc Python loop
+    base_cost = int(C[np.array(route[:-1]), np.array(route[1:])].sum())
+
+    # Per-customer refill detour cost i -> depot -> i
+    detour = C[:, 0] + C[0, :]
 
     extra = 0
     cap = Q
@@ -74,20 +66,15 @@ def apply_refill_recourse(route, q_tilde, Q, C, verbose=False):
         rem -= served
         if verbose:
             print(f"Serve {served} (partial). Remaining={rem}. Need refill trips.")
-        cap = 0
-
-        while rem > 0:
-            # detour i -> depot -> i
-            extra += int(C[node, 0]) + int(C[0, node])
-            cap = Q
-            if verbose:
-                print(f"Refill trip: +({C[node,0]} + {C[0,node]}) distance. cap_left reset to {Q}.")
 
-            take = min(cap, rem)
-            rem -= take
-            cap -= take
-            if verbose:
-                print(f"Serve {take} after refill. Remaining={rem}. cap_left={cap}")
+        # Closed-form refill: each trip delivers up to Q, so the number of
+        # trips and the trailing capacity follow directly
+        trips = (rem + Q - 1) // Q
+        extra += trips * int(detour[node])
+        cap = trips * Q - rem
+        if verbose:
+            print(f"{trips} refill trip(s) of +({C[node,0]} + {C[0,node]}) each "
+                  f"serve the remaining {rem}. cap_left={cap}")
 
     recourse_cost = base_cost + extra
     return base_cost, recourse_cost, extra
@@ -95,15 +82,21 @@ def apply_refill_recourse(route, q_tilde, Q, C, verbose=False):
 if __name__ == "__main__":
     Q, q_nom, C = read_instance("instance.txt")
     rng = np.random.default_rng(0)
+    LO, HI1 = _prepare_bounds(q_nom)
+
+    # Route customer index arrays built once, outside the retry loop
+    CUST_ARRS = [np.asarray([i for i in r if i != 0], dtype=np.int64)
+                 for r in ROUTES]
 
     for attempt in range(1, 100000):
-        q_tilde = sample_demands(q_nom, rng)
+        q_tilde = sample_demands(LO, HI1, rng)
 
         viols = []
-        for r_idx, r in enumerate(ROUTES):
-            v, load = route_violation(r, q_tilde, Q)
+        for r_idx, cust in enumerate(CUST_ARRS):
+            load = int(q_tilde[cust].sum())
+            v = load - Q
             if v > 0:
-                viols.append((v, load, r_idx, r))
+                viols.append((v, load, r_idx, ROUTES[r_idx]))
 
         if viols:
             viols.sort(reverse=True, key=lambda x: x[0])
@@ -1,94 +1,101 @@
 import gurobipy as gp
 from gurobipy import GRB
+import networkx as nx
+import numpy as np
 import time
 import os
 import sys
+from collections import defaultdict
 
-def read_network(filename)
-    arcs = []
-    nodes = set()
+def read_network(filename):
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                parts = line.split()
-                if len(parts) < 2:
-                    continue
-                try:
-                    u, v = int(parts[0]), int(parts[1])
-                    arcs.append((u, v))
-                    nodes.add(u)
-                    nodes.add(v)
-                except ValueError:
-                    continue 
+        # C-level parse of the whole file; only the endpoint columns matter
+        arr = np.loadtxt(filename, dtype=np.int64, usecols=(0, 1), ndmin=2)
     except Exception as e:
         print(f"Error reading {filename}: {e}")
         return [], []
-    return list(nodes), arcs
+    arcs = [(int(u), int(v)) for u, v in arr]
+    nodes = np.unique(arr).tolist()
+    return nodes, arcs
 
 def read_pairs(filename):
     """
     Reads the OD pairs (commodities) for a company.
     Expected format: volume origin destination
     Skips header lines automatically.
+    Returns parallel arrays (vols, origs, dests), one entry per commodity.
     """
-    commodities = []
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                parts = line.split()
-                if len(parts) >= 3:
-                    try:
-                        vol = float(parts[0])
-                        orig = int(parts[1])
-                        dest = int(parts[2])
-                        commodities.append({'vol': vol, 'orig': orig, 'dest': dest})
-                    except ValueError:
-                        continue 
+        # C-level parse; the single header line is skipped explicitly
+        arr = np.loadtxt(filename, skiprows=1, ndmin=2)
     except Exception as e:
         print(f"Error reading {filename}: {e}")
-        return []
-    return commodities
+        arr = np.empty((0, 3))
+    return (np.ascontiguousarray(arr[:, 0], dtype=np.float64),
+            np.ascontiguousarray(arr[:, 1], dtype=np.int32),
+            np.ascontiguousarray(arr[:, 2], dtype=np.int32))
 
-def solve_charging_location(nodes, arcs, commodities, company_name):
+def solve_charging_location(nodes, arcs, vols, origs, dests, company_name):
     print(f"\n--- Solving for Company {company_name} ---")
-    
-    Q = 10.0  
-    
+
+    Q = 10.0
+    K = len(vols)
+
     m = gp.Model(f"ChargingLocation_{company_name}")
     m.setParam('OutputFlag', 0)
-    
+
     y = m.addVars(nodes, vtype=GRB.BINARY, name="y")
-    arc_tuples = gp.tuplelist(arcs)
-    x = {}
-    
-   
-    for k_idx, comm in enumerate(commodities):
-        for i, j in arcs:
-            x[k_idx, i, j] = m.addVar(lb=0.0, ub=1.0, vtype=GRB.CONTINUOUS)
+
+    # All commodity-arc variables in one batched call
+    x = m.addVars(range(K), arcs, lb=0.0, ub=1.0, name="x")
+
+    # In/out neighbor lists built once instead of a tuplelist scan per constraint
+    in_neighbors = {i: [] for i in nodes}
+    out_neighbors = {i: [] for i in nodes}
+    for u, v in arcs:
+        out_neighbors[u].append(v)
+        in_neighbors[v].append(u)
 
     m.setObjective(gp.quicksum(y[i] for i in nodes), GRB.MINIMIZE)
-    
-   
-    for k_idx, comm in enumerate(commodities):
-        s_k = comm['orig']
-        t_k = comm['dest']
-        
+
+    # Warm start: one shortest-path tree per unique origin gives every
+    # commodity a feasible routing to hand the solver as an incumbent
+    by_orig = defaultdict(list)
+    for k_idx in range(K):
+        by_orig[int(origs[k_idx])].append(k_idx)
+
+    G = nx.DiGraph(arcs)
+    for orig, k_idxs in by_orig.items():
+        paths = nx.single_source_shortest_path(G, orig)
+        for k_idx in k_idxs:
+            path = paths.get(int(dests[k_idx]))
+            if path is None:
+                continue
+            for a, b in zip(path[:-1], path[1:]):
+                x[k_idx, a, b].Start = 1.0
+
+    for k_idx in range(K):
+        s_k = int(origs[k_idx])
+        t_k = int(dests[k_idx])
+
         for i in nodes:
-            flow_in = gp.quicksum(x[k_idx, j, i] for j, i_node in arc_tuples.select('*', i))
-            flow_out = gp.quicksum(x[k_idx, i, j] for i_node, j in arc_tuples.select(i, '*'))
-            
+            flow_in = gp.quicksum(x[k_idx, j, i] for j in in_neighbors[i])
+            flow_out = gp.quicksum(x[k_idx, i, j] for j in out_neighbors[i])
+
             rhs = 0
             if i == s_k: rhs = 1
             elif i == t_k: rhs = -1
-            
+
             m.addConstr(flow_out - flow_in == rhs)
 
     for i in nodes:
+        # Vectorized filter over the origin array instead of a dict
+        # lookup per commodity
+        k_sel = np.where(origs != i)[0]
         leaving_volume = gp.quicksum(
-            comm['vol'] * x[k_idx, i, j]
-            for k_idx, comm in enumerate(commodities) 
-            if comm['orig'] != i
-            for i_node, j in arc_tuples.select(i, '*')
+            float(vols[k_idx]) * x[k_idx, i, j]
+            for k_idx in k_sel
+            for j in out_neighbors[i]
         )
         m.addConstr(leaving_volume <= Q * y[i])
 
@@ -98,7 +105,9 @@ def solve_charging_location(nodes, arcs, commodities, company_name):
     
     if m.status == GRB.OPTIMAL:
         obj_val = m.objVal
-        open_locs = [i for i in nodes if y[i].X > 0.5]
+        # One bulk attribute fetch instead of a Gurobi call per node
+        y_vals = m.getAttr('X', y)
+        open_locs = [i for i in nodes if y_vals[i] > 0.5]
         print(f"Status: Optimal")
         print(f"Time: {end_time - start_time:.4f}s")
         print(f"Optimal Number of Facilities: {obj_val}")
@@ -130,11 +139,11 @@ if __name__ == "__main__":
             print(f"Skipping {company}: File not found")
             continue
             
-        commodities = read_pairs(filename)
-        print(f"Loaded {len(commodities)} commodities for Company {company}")
-        
-        if len(commodities) > 0:
-            obj, locs = solve_charging_location(nodes, arcs, commodities, company)
+        vols, origs, dests = read_pairs(filename)
+        print(f"Loaded {len(vols)} commodities for Company {company}")
+
+        if len(vols) > 0:
+            obj, locs = solve_charging_location(nodes, arcs, vols, origs, dests, company)
             results[company] = (obj, locs)
         else:
             print(f"Warning: No valid commodities found in pairs{company}.txt")
@@ -1,79 +1,84 @@
 import gurobipy as gp
 from gurobipy import GRB
+import numpy as np
 import time
 import os
 import sys
 from itertools import combinations
 import math
 
+# Solver thread count, overridable for reproducible benchmarking
+THREADS = int(os.environ.get("GUROBI_THREADS", os.cpu_count() or 1))
+
 def read_network(filename):
-    arcs = []
-    nodes = set()
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                parts = line.split()
-                if len(parts) < 2: continue
-                try:
-                    u, v = int(parts[0]), int(parts[1])
-                    arcs.append((u, v))
-                    nodes.add(u); nodes.add(v)
-                except ValueError: continue
+        # C-level parse of the whole file; only the endpoint columns matter
+        arr = np.loadtxt(filename, dtype=np.int64, usecols=(0, 1), ndmin=2)
     except Exception: return [], []
-    return list(nodes), arcs
+    arcs = [(int(u), int(v)) for u, v in arr]
+    return np.unique(arr).tolist(), arcs
 
 def read_pairs(filename):
-    commodities = []
+    """Parallel arrays (vols, origs, dests), one entry per commodity."""
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                parts = line.split()
-                if len(parts) >= 3:
-                    try:
-                        vol = float(parts[0])
-                        orig = int(parts[1])
-                        dest = int(parts[2])
-                        commodities.append({'vol': vol, 'orig': orig, 'dest': dest})
-                    except ValueError: continue
-    except Exception: return []
-    return commodities
-
-def solve_model(nodes, arcs, commodities, label):
-    m = gp.Model(f"Coalition_{label}")
+        # C-level parse; the single header line is skipped explicitly
+        arr = np.loadtxt(filename, skiprows=1, ndmin=2)
+    except Exception: arr = np.empty((0, 3))
+    return (np.ascontiguousarray(arr[:, 0], dtype=np.float64),
+            np.ascontiguousarray(arr[:, 1], dtype=np.int32),
+            np.ascontiguousarray(arr[:, 2], dtype=np.int32))
+
+def build_grand_model(nodes, arcs, vols, origs, dests):
+    """One model over all commodities; a coalition is selected by zeroing
+    the excluded commodities' variable UBs and flow-conservation RHS."""
+    m = gp.Model("Coalitions")
     m.setParam('OutputFlag', 0)
-    
+    m.Params.Threads = THREADS
+    m.Params.Method = 2  # barrier for the (near-LP) relaxations
+
     Q = 10.0
+    K = len(vols)
     y = m.addVars(nodes, vtype=GRB.BINARY, name="y")
-    x = {}
-    arc_tuples = gp.tuplelist(arcs)
-    
-    for k_idx, comm in enumerate(commodities):
-        for i, j in arcs:
-            x[k_idx, i, j] = m.addVar(lb=0.0, ub=1.0, vtype=GRB.CONTINUOUS)
+
+    # All commodity-arc variables in one batched call
+    x = m.addVars(range(K), arcs, lb=0.0, ub=1.0, name="x")
+
+    # In/out neighbor lists built once instead of a tuplelist scan per constraint
+    in_neighbors = {i: [] for i in nodes}
+    out_neighbors = {i: [] for i in nodes}
+    for u, w in arcs:
+        out_neighbors[u].append(w)
+        in_neighbors[w].append(u)
 
     m.setObjective(gp.quicksum(y[i] for i in nodes), GRB.MINIMIZE)
-    
-    for k_idx, comm in enumerate(commodities):
-        s_k = comm['orig']; t_k = comm['dest']
+
+    # Flow-conservation handles and their active RHS are kept per
+    # commodity so a commodity can be switched off (all-zero flow is
+    # feasible once its RHS is zeroed along with its UBs)
+    flow_constrs = []
+    base_rhs = []
+    for k_idx in range(K):
+        s_k = int(origs[k_idx]); t_k = int(dests[k_idx])
         for i in nodes:
-            flow_in = gp.quicksum(x[k_idx, j, i] for j, i_node in arc_tuples.select('*', i))
-            flow_out = gp.quicksum(x[k_idx, i, j] for i_node, j in arc_tuples.select(i, '*'))
+            flow_in = gp.quicksum(x[k_idx, j, i] for j in in_neighbors[i])
+            flow_out = gp.quicksum(x[k_idx, i, j] for j in out_neighbors[i])
             rhs = 1 if i == s_k else (-1 if i == t_k else 0)
-            m.addConstr(flow_out - flow_in == rhs)
+            flow_constrs.append(m.addConstr(flow_out - flow_in == rhs))
+            base_rhs.append(float(rhs))
 
     for i in nodes:
-        leaving_volume = gp.quicksum(
-            comm['vol'] * x[k_idx, i, j]
-            for k_idx, comm in enumerate(commodities) 
-            if comm['orig'] != i
-            for i_node, j in arc_tuples.select(i, '*')
-        )
+        # Vectorized filter over the origin array, then one addTerms call
+        # instead of a Python-level quicksum reduction
+        k_sel = np.where(origs != i)[0]
+        outs = out_neighbors[i]
+        coefs = np.repeat(vols[k_sel], len(outs)).tolist()
+        xvars = [x[k_idx, i, j] for k_idx in k_sel for j in outs]
+        leaving_volume = gp.LinExpr()
+        leaving_volume.addTerms(coefs, xvars)
         m.addConstr(leaving_volume <= Q * y[i])
 
-    m.optimize()
-    if m.status == GRB.OPTIMAL:
-        return m.objVal
-    return None
+    ordered_x = [x[k_idx, i, j] for k_idx in range(K) for i, j in arcs]
+    return m, ordered_x, flow_constrs, np.asarray(base_rhs)
 
 if __name__ == "__main__":
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -94,17 +99,31 @@ if __name__ == "__main__":
         subsets.extend(combinations(all_companies, r))
     
     print(f"\n--- Computing Costs for {len(subsets)} Coalitions ---")
-    
+
+    # One grand-coalition model reused across all subsets: excluded
+    # commodities get UB 0 and a zero flow RHS, and each re-optimize
+    # starts from the previous basis instead of a cold build
+    vols = np.concatenate([company_data[c][0] for c in all_companies])
+    origs = np.concatenate([company_data[c][1] for c in all_companies])
+    dests = np.concatenate([company_data[c][2] for c in all_companies])
+    owners = np.concatenate(
+        [np.full(len(company_data[c][0]), c) for c in all_companies])
+
+    m, ordered_x, flow_constrs, base_rhs = build_grand_model(
+        nodes, arcs, vols, origs, dests)
+    n_nodes = len(nodes)
+
     for coalition in subsets:
         coalition_name = "".join(coalition)
-        
-        combined_commodities = []
-        for c in coalition:
-            combined_commodities.extend(company_data[c])
-            
+        active = np.isin(owners, list(coalition))
+        m.setAttr("UB", ordered_x,
+                  np.repeat(active.astype(float), len(arcs)).tolist())
+        m.setAttr("RHS", flow_constrs,
+                  np.where(np.repeat(active, n_nodes), base_rhs, 0.0).tolist())
+        m.optimize()
+        cost = m.objVal if m.status == GRB.OPTIMAL else None
+
         print(f"Solving for {{{coalition_name}}} ... ", end="")
-        cost = solve_model(nodes, arcs, combined_commodities, coalition_name)
-        
         if cost is not None:
             v[coalition] = cost
             print(f"Cost: {cost}")
@@ -115,9 +134,15 @@ if __name__ == "__main__":
     print("\n--- Shapley Value Calculation ---")
     shapley_values = {i: 0.0 for i in all_companies}
     N = len(all_companies)
-    
+
+    # Only N distinct weights exist; hoist them out of the marginal loop
+    W = [math.factorial(s) * math.factorial(N - s - 1) / math.factorial(N)
+         for s in range(N)]
+
     for i in all_companies:
-        print(f"\nCalculating for {i}:")
+        # Trace lines are batched into one print per company so the loop
+        # body does no I/O
+        trace = [f"\nCalculating for {i}:"]
         remaining_companies = [c for c in all_companies if c != i]
         
         S_list = []
@@ -127,19 +152,20 @@ if __name__ == "__main__":
         for S in S_list:
             S_union_i = tuple(sorted(list(S) + [i]))
             
-            val_S = v[S] if S in v else 0.0
+            val_S = v.get(S, 0.0)
             val_S_union_i = v[S_union_i]
-            
+
             marginal_contribution = val_S_union_i - val_S
-            
-            s_len = len(S)
-            weight = (math.factorial(s_len) * math.factorial(N - s_len - 1)) / math.factorial(N)
-            
+
+            weight = W[len(S)]
+
             term = weight * marginal_contribution
             shapley_values[i] += term
             
             S_str = "".join(S) if S else "{}"
-            print(f"  S={{{S_str:<2}}} | Marg: {val_S_union_i:.1f} - {val_S:.1f} = {marginal_contribution:.1f} | W: {weight:.3f} | Term: {term:.3f}")
+            trace.append(f"  S={{{S_str:<2}}} | Marg: {val_S_union_i:.1f} - {val_S:.1f} = {marginal_contribution:.1f} | W: {weight:.3f} | Term: {term:.3f}")
+
+        print("\n".join(trace))
 
     print("\n" + "="*50)
     print(f"{'Coalition':<15} | {'Cost v(S)':<10}")
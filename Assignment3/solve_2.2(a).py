@@ -1,140 +1,192 @@
 import gurobipy as gp
 from gurobipy import GRB
-import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+import math
 import os
 import sys
 
 def read_network_with_dist(filename):
-    dist_map = {}
-    nodes = set()
-    arcs = []
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                parts = line.split()
-                if len(parts) < 3: continue
-                try:
-                    u, v = int(parts[0]), int(parts[1])
-                    d = float(parts[2])
-                    dist_map[(u, v)] = d
-                    arcs.append((u, v))
-                    nodes.add(u); nodes.add(v)
-                except ValueError: continue
+        # C-level parse of the whole file
+        arr = np.loadtxt(filename, ndmin=2)
     except Exception as e:
         print(f"Error: {e}")
         return [], [], {}
-    return list(nodes), arcs, dist_map
+    uv = arr[:, :2].astype(np.int64)
+    arcs = [(int(u), int(v)) for u, v in uv]
+    dist_map = dict(zip(arcs, arr[:, 2].tolist()))
+    return np.unique(uv).tolist(), arcs, dist_map
 
 def read_all_pairs(script_dir):
-    all_commodities = []
+    """Parallel arrays (vols, origs, dests) over all companies' pairs."""
+    chunks = []
     for company in ['A', 'B', 'C']:
         fname = os.path.join(script_dir, f"pairs{company}.txt")
         if not os.path.exists(fname): continue
-        with open(fname, 'r') as f:
-            for line in f:
-                parts = line.split()
-                if len(parts) >= 3:
-                    try:
-                        vol = float(parts[0])
-                        orig = int(parts[1])
-                        dest = int(parts[2])
-                        all_commodities.append({'vol': vol, 'orig': orig, 'dest': dest, 'company': company})
-                    except ValueError: continue
-    return all_commodities
-
-def solve_system_optimum(nodes, arcs, dist_map, commodities):
+        # C-level parse; the single header line is skipped explicitly
+        chunks.append(np.loadtxt(fname, skiprows=1, ndmin=2))
+    arr = np.concatenate(chunks) if chunks else np.empty((0, 3))
+    return (np.ascontiguousarray(arr[:, 0], dtype=np.float64),
+            np.ascontiguousarray(arr[:, 1], dtype=np.int32),
+            np.ascontiguousarray(arr[:, 2], dtype=np.int32))
+
+def solve_system_optimum(nodes, arcs, dist_map, vols, origs, dests):
     print("\n--- Step 1: Solving System Optimal (Grand Coalition) ---")
     m = gp.Model("GrandCoalition")
     m.setParam('OutputFlag', 0)
-    
+
     Q = 10.0
+    K = len(vols)
     y = m.addVars(nodes, vtype=GRB.BINARY, name="y")
-    x = {}
-    arc_tuples = gp.tuplelist(arcs)
-    
-    for k_idx, comm in enumerate(commodities):
-        for i, j in arcs:
-            x[k_idx, i, j] = m.addVar(lb=0.0, ub=1.0, vtype=GRB.CONTINUOUS)
 
-    obj_facilities = gp.quicksum(y[i] for i in nodes)
-    m.setObjectiveN(obj_facilities, index=0, priority=2, name="MinFacilities")
+    # All commodity-arc variables in one batched call
+    x = m.addVars(range(K), arcs, lb=0.0, ub=1.0, name="x")
 
+    # In/out neighbor lists built once instead of a tuplelist scan per constraint
+    in_neighbors = {i: [] for i in nodes}
+    out_neighbors = {i: [] for i in nodes}
+    for u, w in arcs:
+        out_neighbors[u].append(w)
+        in_neighbors[w].append(u)
+
+    obj_facilities = gp.quicksum(y[i] for i in nodes)
     obj_distance = gp.quicksum(
-        dist_map[(i,j)] * x[k_idx, i, j] 
-        for k_idx in range(len(commodities)) 
+        dist_map[(i,j)] * x[k_idx, i, j]
+        for k_idx in range(K)
         for i, j in arcs
     )
-    m.setObjectiveN(obj_distance, index=1, priority=1, name="MinDistance")
 
-    for k_idx, comm in enumerate(commodities):
-        s_k = comm['orig']; t_k = comm['dest']
+    # Blend the two lexicographic objectives into one solve: BIG exceeds
+    # any achievable distance total (every commodity using every arc), so
+    # the facility count still strictly dominates, without the per-level
+    # re-solves of hierarchical setObjectiveN
+    BIG = K * len(arcs) * max(dist_map.values()) + 1
+    m.setObjective(BIG * obj_facilities + obj_distance, GRB.MINIMIZE)
+
+    # With the facility term scaled by BIG, the default relative MIPGap
+    # of 1e-4 would tolerate an absolute slack of thousands of distance
+    # units on the secondary objective; require a proven optimum instead
+    m.Params.MIPGap = 0
+
+    for k_idx in range(K):
+        s_k = int(origs[k_idx]); t_k = int(dests[k_idx])
         for i in nodes:
-            flow_in = gp.quicksum(x[k_idx, j, i] for j, i_node in arc_tuples.select('*', i))
-            flow_out = gp.quicksum(x[k_idx, i, j] for i_node, j in arc_tuples.select(i, '*'))
+            flow_in = gp.quicksum(x[k_idx, j, i] for j in in_neighbors[i])
+            flow_out = gp.quicksum(x[k_idx, i, j] for j in out_neighbors[i])
             rhs = 1 if i == s_k else (-1 if i == t_k else 0)
             m.addConstr(flow_out - flow_in == rhs)
 
     for i in nodes:
-        leaving_volume = gp.quicksum(
-            comm['vol'] * x[k_idx, i, j]
-            for k_idx, comm in enumerate(commodities) 
-            if comm['orig'] != i
-            for i_node, j in arc_tuples.select(i, '*')
-        )
+        # Vectorized filter over the origin array, then one addTerms call
+        # instead of a Python-level quicksum reduction
+        k_sel = np.where(origs != i)[0]
+        outs = out_neighbors[i]
+        coefs = np.repeat(vols[k_sel], len(outs)).tolist()
+        xvars = [x[k_idx, i, j] for k_idx in k_sel for j in outs]
+        leaving_volume = gp.LinExpr()
+        leaving_volume.addTerms(coefs, xvars)
         m.addConstr(leaving_volume <= Q * y[i])
 
     m.optimize()
-    
+
     if m.status == GRB.OPTIMAL:
-        open_stations = {i for i in nodes if y[i].X > 0.5}
-        
-        total_dist = 0.0
-        for k_idx in range(len(commodities)):
-            for i, j in arcs:
-                if x[k_idx, i, j].X > 0.001:
-                    total_dist += dist_map[(i, j)]
-        
+        # One bulk attribute fetch per variable family instead of a
+        # Gurobi call per .X access
+        y_vals = m.getAttr('X', y)
+        open_stations = {i for i in nodes if y_vals[i] > 0.5}
+
+        x_vals = np.asarray(m.getAttr(
+            'X', [x[k_idx, i, j] for k_idx in range(K) for i, j in arcs]))
+        arc_dists = np.asarray([dist_map[a] for a in arcs])
+        total_dist = float(
+            ((x_vals.reshape(K, len(arcs)) > 0.001) * arc_dists).sum())
+
         return open_stations, total_dist
     return None, None
 
-def simulate_selfish_routing(nodes, arcs, dist_map, commodities, open_stations):
+def simulate_selfish_routing(nodes, arcs, dist_map, vols, origs, dests, open_stations):
     print("\n--- Step 2: Simulating Selfish Routing ---")
-    
-    G = nx.DiGraph()
-    for u in nodes:
-        G.add_node(u)
-    
+
     total_selfish_distance = 0.0
-    station_usage = {i: 0.0 for i in nodes}
-    
-    FullG = nx.DiGraph()
+
+    idx = {node: i for i, node in enumerate(nodes)}
+    n = len(nodes)
+
+    origins = sorted(int(s) for s in np.unique(origs))
+    origin_set = set(origins)
+
+    # Restricted graph as a CSR matrix: arcs between open stations plus
+    # each origin's arcs into the stations. No other closed node gets an
+    # outgoing arc, so closed nodes can never appear as intermediates;
+    # closed destinations are reached by composing the Dijkstra tree with
+    # one final arc below.
+    rows, cols, data = [], [], []
     for (u, v), d in dist_map.items():
-        FullG.add_edge(u, v, weight=d)
-        
-    print(f"Routing {len(commodities)} travelers...")
-    
-    for comm in commodities:
-        s = comm['orig']
-        t = comm['dest']
-        vol = comm['vol']
-        
-        valid_nodes = open_stations.union({s, t})
-        subG = FullG.subgraph(valid_nodes)
-        
-        try:
-            path = nx.shortest_path(subG, source=s, target=t, weight='weight')
-            
-            path_dist = 0
-            for k in range(len(path)-1):
-                u, v = path[k], path[k+1]
-                path_dist += dist_map[(u, v)]
-            total_selfish_distance += path_dist
-            
-            for node in path[1:-1]: 
-                station_usage[node] += vol
-                
-        except nx.NetworkXNoPath:
+        if v in open_stations and (u in open_stations or u in origin_set):
+            rows.append(idx[u]); cols.append(idx[v]); data.append(d)
+    W = csr_matrix((data, (rows, cols)), shape=(n, n))
+
+    # One C-level multi-source Dijkstra for all unique origins at once
+    src_idx = np.array([idx[s] for s in origins])
+    dist_mat, pred = dijkstra(W, indices=src_idx, return_predecessors=True)
+    row_of = {s: r for r, s in enumerate(origins)}
+
+    # Arcs entering each node from an open station, for the final hop
+    in_from_open = {}
+    for (u, v), d in dist_map.items():
+        if u in open_stations:
+            in_from_open.setdefault(v, []).append((u, d))
+
+    print(f"Routing {len(vols)} travelers...")
+
+    # Interior stations are collected as (index, volume) pairs and
+    # scattered into the usage vector in one np.add.at call at the end
+    usage_idx = []
+    usage_vol = []
+
+    for k_idx in range(len(vols)):
+        s = int(origs[k_idx])
+        t = int(dests[k_idx])
+        vol = float(vols[k_idx])
+        drow = dist_mat[row_of[s]]
+        prow = pred[row_of[s]]
+
+        if t in open_stations:
+            best_d = float(drow[idx[t]])
+            last_open = t
+        else:
+            # t is outside the matrix; compose tree + one arc into t
+            best_d = float('inf')
+            last_open = None
+            for u, d in in_from_open.get(t, []):
+                if drow[idx[u]] + d < best_d:
+                    best_d = float(drow[idx[u]] + d)
+                    last_open = u
+            d_direct = dist_map.get((s, t))
+            if d_direct is not None and d_direct < best_d:
+                best_d = float(d_direct)
+                last_open = s
+
+        if not math.isfinite(best_d):
             print(f"Warning: No valid path for traveler {s}->{t}!")
+            continue
+
+        total_selfish_distance += best_d
+
+        # Walk the predecessor row back to s; every node visited before
+        # reaching s is an open station on the interior of the path
+        j = idx[last_open]
+        while j >= 0 and j != idx[s]:
+            if nodes[j] != t:
+                usage_idx.append(j)
+                usage_vol.append(vol)
+            j = prow[j]
+
+    usage_arr = np.zeros(n)
+    np.add.at(usage_arr, usage_idx, usage_vol)
+    station_usage = {node: float(usage_arr[i]) for i, node in enumerate(nodes)}
 
     return total_selfish_distance, station_usage
 
@@ -143,16 +195,16 @@ if __name__ == "__main__":
     def get_path(filename): return os.path.join(script_dir, filename)
 
     nodes, arcs, dist_map = read_network_with_dist(get_path("network.txt"))
-    commodities = read_all_pairs(script_dir)
-    print(f"Loaded {len(nodes)} nodes, {len(arcs)} arcs, {len(commodities)} commodities.")
+    vols, origs, dests = read_all_pairs(script_dir)
+    print(f"Loaded {len(nodes)} nodes, {len(arcs)} arcs, {len(vols)} commodities.")
 
-    open_stations, system_dist = solve_system_optimum(nodes, arcs, dist_map, commodities)
+    open_stations, system_dist = solve_system_optimum(nodes, arcs, dist_map, vols, origs, dests)
     
     if open_stations:
         print(f"System Optimal Locations ({len(open_stations)}): {sorted(list(open_stations))}")
         print(f"System Optimal Total Distance: {system_dist:.2f}")
         
-        selfish_dist, usage = simulate_selfish_routing(nodes, arcs, dist_map, commodities, open_stations)
+        selfish_dist, usage = simulate_selfish_routing(nodes, arcs, dist_map, vols, origs, dests, open_stations)
         
         print(f"Selfish Routing Total Distance: {selfish_dist:.2f}")
         
@@ -1,7 +1,14 @@
 import math
+import os
+
+import numpy as np
+from scipy.sparse import csr_matrix
 import gurobipy as gp
 from gurobipy import GRB
 
+# Solver thread count, overridable for reproducible benchmarking
+THREADS = int(os.environ.get("GUROBI_THREADS", os.cpu_count() or 1))
+
 
 def read_instance(path):
     with open(path, "r", encoding="utf-8") as f:
@@ -11,24 +18,26 @@ def read_instance(path):
 
 
 def read_routes(path, n_customers):
+    """Distances plus one uint64 membership bitmask per route (bit i set
+    when customer i is served; n_customers fits in 64 bits here)."""
     distances = []
-    customers_in_route = []
+    masks = []
 
     with open(path, "r", encoding="utf-8") as f:
         for line in f:
-            line = line.strip()
-            if not line:
+            # Tokenize in C; columns are dist, stop count, then node ids
+            vals = np.fromstring(line, dtype=np.int64, sep=" ")
+            if vals.size == 0:
                 continue
 
-            parts = [int(x) for x in line.split()]
-            dist = parts[0]
-            nodes = parts[2:]
-            cust = set(v for v in nodes if v != 0 and 1 <= v <= n_customers)
+            cust = vals[2:]
+            cust = cust[(cust >= 1) & (cust <= n_customers)]
+            mask = np.bitwise_or.reduce(np.uint64(1) << cust.astype(np.uint64))
 
-            distances.append(dist)
-            customers_in_route.append(cust)
+            distances.append(int(vals[0]))
+            masks.append(mask)
 
-    return distances, customers_in_route
+    return distances, np.array(masks, dtype=np.uint64)
 
 
 def fmt_num(x, digits=4):
@@ -45,28 +54,33 @@ def main():
     capacity, demands = read_instance("instance.txt")
     n = len(demands)
 
-    distances, custs = read_routes("routes.txt", n)
-    R = range(len(distances))
+    distances, masks = read_routes("routes.txt", n)
+    dist_arr = np.asarray(distances, dtype=np.float64)
+    nR = len(distances)
 
-    cover = [[] for _ in range(n + 1)]
-    for r in R:
-        for i in custs[r]:
-            cover[i].append(r)
+    # One broadcasted shift yields the whole customer-route membership
+    # matrix, which doubles as the set-partition incidence matrix
+    bits = (masks[None, :] >> np.arange(1, n + 1, dtype=np.uint64)[:, None]) & np.uint64(1)
 
-    for i in range(1, n + 1):
-        if not cover[i]:
-            raise ValueError(f"Customer {i} is not covered by any route")
+    uncovered = np.where(bits.sum(axis=1) == 0)[0]
+    if uncovered.size:
+        raise ValueError(f"Customer {int(uncovered[0]) + 1} is not covered by any route")
 
     model = gp.Model("cvrp_route_based")
     model.Params.OutputFlag = 0
+    model.Params.Threads = THREADS
+    model.Params.MIPFocus = 1
+    model.Params.Presolve = 2
 
-    x = model.addVars(len(distances), vtype=GRB.BINARY, name="x")
+    x = model.addMVar(nR, vtype=GRB.BINARY, name="x")
 
-    for i in range(1, n + 1):
-        model.addConstr(gp.quicksum(x[r] for r in cover[i]) == 1)
+    # All n partition rows go to the solver in one matrix constraint
+    rows, cols = np.nonzero(bits)
+    A = csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, nR))
+    model.addConstr(A @ x == np.ones(n))
 
-    model.addConstr(gp.quicksum(x[r] for r in R) <= vehicles)
-    model.setObjective(gp.quicksum(distances[r] * x[r] for r in R), GRB.MINIMIZE)
+    model.addConstr(x.sum() <= vehicles)
+    model.setObjective(dist_arr @ x, GRB.MINIMIZE)
 
     model.optimize()
 
@@ -77,10 +91,9 @@ def main():
 
     if model.SolCount > 0:
         cost = float(model.ObjVal)
-        chosen = [r for r in R if x[r].X > 0.5]
-        chosen_dist = [distances[r] for r in chosen]
-        if chosen_dist:
-            route_range = float(max(chosen_dist) - min(chosen_dist))
+        chosen_dist = dist_arr[x.X > 0.5]
+        if chosen_dist.size:
+            route_range = float(chosen_dist.max() - chosen_dist.min())
 
     # One final line with the required metrics
     print(
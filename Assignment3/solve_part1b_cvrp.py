@@ -1,7 +1,14 @@
 import math
+import os
+
+import numpy as np
+from scipy.sparse import csr_matrix
 import gurobipy as gp
 from gurobipy import GRB
 
+# Solver thread count, overridable for reproducible benchmarking
+THREADS = int(os.environ.get("GUROBI_THREADS", os.cpu_count() or 1))
+
 
 def read_instance(path):
     with open(path, "r", encoding="utf-8") as f:
@@ -11,24 +18,26 @@ def read_instance(path):
 
 
 def read_routes(path, n_customers):
+    """Distances plus one uint64 membership bitmask per route (bit i set
+    when customer i is served; n_customers fits in 64 bits here)."""
     distances = []
-    customers_in_route = []
+    masks = []
 
     with open(path, "r", encoding="utf-8") as f:
         for line in f:
-            line = line.strip()
-            if not line:
+            # Tokenize in C; columns are dist, stop count, then node ids
+            vals = np.fromstring(line, dtype=np.int64, sep=" ")
+            if vals.size == 0:
                 continue
 
-            parts = [int(x) for x in line.split()]
-            dist = parts[0]
-            nodes = parts[2:]
-            cust = set(v for v in nodes if v != 0 and 1 <= v <= n_customers)
+            cust = vals[2:]
+            cust = cust[(cust >= 1) & (cust <= n_customers)]
+            mask = np.bitwise_or.reduce(np.uint64(1) << cust.astype(np.uint64))
 
-            distances.append(dist)
-            customers_in_route.append(cust)
+            distances.append(int(vals[0]))
+            masks.append(mask)
 
-    return distances, customers_in_route
+    return distances, np.array(masks, dtype=np.uint64)
 
 
 def fmt_num(x, digits=4):
@@ -47,43 +56,54 @@ def main():
     capacity, demands = read_instance("instance.txt")
     n = len(demands)
 
-    c, route_customers = read_routes("routes.txt", n)
-    p = c
-    R = range(len(c))
+    c, masks = read_routes("routes.txt", n)
+    c_arr = np.asarray(c, dtype=np.float64)
+    p_arr = c_arr
+    nR = len(c)
 
-    a = [[] for _ in range(n + 1)]
-    for r in R:
-        for i in route_customers[r]:
-            a[i].append(r)
+    # One broadcasted shift yields the whole customer-route membership
+    # matrix, which doubles as the set-partition incidence matrix
+    bits = (masks[None, :] >> np.arange(1, n + 1, dtype=np.uint64)[:, None]) & np.uint64(1)
 
-    for i in range(1, n + 1):
-        if not a[i]:
-            raise ValueError(f"Customer {i} is not covered by any route")
+    uncovered = np.where(bits.sum(axis=1) == 0)[0]
+    if uncovered.size:
+        raise ValueError(f"Customer {int(uncovered[0]) + 1} is not covered by any route")
 
     model = gp.Model("cvrp_range_vehicle_index")
     model.Params.OutputFlag = 0
+    model.Params.Threads = THREADS
+    model.Params.MIPFocus = 1
+    model.Params.Presolve = 2
+    model.Params.NodeMethod = 2
+    model.Params.Symmetry = 2
 
     K = range(vehicles)
-    R = range(len(c))
-    x = model.addVars(vehicles, len(c), vtype=GRB.BINARY, name="x")
+    x = model.addMVar((vehicles, nR), vtype=GRB.BINARY, name="x")
     gamma = model.addVar(lb=0.0, vtype=GRB.CONTINUOUS, name="gamma")
     eta = model.addVar(lb=0.0, vtype=GRB.CONTINUOUS, name="eta")
 
-    for i in range(1, n + 1):
-        model.addConstr(gp.quicksum(x[k, r] for k in K for r in a[i]) == 1)
+    # All n partition rows in one matrix constraint, summed over vehicles
+    rows, cols = np.nonzero(bits)
+    A = csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, nR))
+    model.addConstr(gp.quicksum(A @ x[k] for k in K) == np.ones(n))
 
-    for k in K:
-        model.addConstr(gp.quicksum(x[k, r] for r in R) == 1)
+    model.addConstr(x.sum(axis=1) == 1)
 
     model.addConstr(
-        gp.quicksum(c[r] * x[k, r] for k in K for r in R) <= (1.0 + eps) * z_star
+        gp.quicksum(c_arr @ x[k] for k in K) <= (1.0 + eps) * z_star
     )
 
     for k in K:
-        payoff_k = gp.quicksum(p[r] * x[k, r] for r in R)
+        payoff_k = p_arr @ x[k]
         model.addConstr(gamma <= payoff_k)
         model.addConstr(payoff_k <= eta)
 
+    # Vehicles are interchangeable, so any permutation of a solution is
+    # also feasible; ordering the payoffs removes that symmetry from the
+    # branch-and-bound tree
+    for k in range(vehicles - 1):
+        model.addConstr(p_arr @ x[k] >= p_arr @ x[k + 1])
+
     model.setObjective(eta - gamma, GRB.MINIMIZE)
     model.optimize()
 
@@ -95,12 +115,13 @@ def main():
     if model.SolCount > 0:
         cost = 0.0
         chosen_dist = []
+        Xv = x.X
         for k in K:
-            for r in R:
-                if x[k, r].X > 0.5:
-                    cost += c[r]
-                    chosen_dist.append(p[r])
-                    break
+            sel = np.nonzero(Xv[k] > 0.5)[0]
+            if sel.size:
+                r = int(sel[0])
+                cost += c[r]
+                chosen_dist.append(float(p_arr[r]))
         if chosen_dist:
             route_range = float(max(chosen_dist) - min(chosen_dist))
 
@@ -1,8 +1,14 @@
 import math
+import os
 
+import numpy as np
+from scipy.sparse import csr_matrix
 import gurobipy as gp
 from gurobipy import GRB
 
+# Solver thread count, overridable for reproducible benchmarking
+THREADS = int(os.environ.get("GUROBI_THREADS", os.cpu_count() or 1))
+
 
 def read_instance(path):
 	with open(path, "r", encoding="utf-8") as f:
@@ -12,28 +18,29 @@ def read_instance(path):
 
 
 def read_routes(path, n_customers):
+	"""Distances, one uint64 membership bitmask per route (bit i set when
+	customer i is served) and the last served customer per route."""
 	c = []
-	route_customers = []
+	masks = []
 	last_customer = []
 
 	with open(path, "r", encoding="utf-8") as f:
 		for line in f:
-			line = line.strip()
-			if not line:
+			# Tokenize in C; columns are dist, stop count, then node ids
+			vals = np.fromstring(line, dtype=np.int64, sep=" ")
+			if vals.size == 0:
 				continue
 
-			parts = [int(x) for x in line.split()]
-			dist = parts[0]
-			nodes = parts[2:]
-			cust = [v for v in nodes if v != 0 and 1 <= v <= n_customers]
-			if not cust:
+			cust = vals[2:]
+			cust = cust[(cust >= 1) & (cust <= n_customers)]
+			if cust.size == 0:
 				continue
 
-			c.append(dist)
-			route_customers.append(set(cust))
-			last_customer.append(cust[-1])
+			c.append(int(vals[0]))
+			masks.append(np.bitwise_or.reduce(np.uint64(1) << cust.astype(np.uint64)))
+			last_customer.append(int(cust[-1]))
 
-	return c, route_customers, last_customer
+	return c, np.array(masks, dtype=np.uint64), last_customer
 
 
 def fmt_num(x, digits=4):
@@ -44,33 +51,51 @@ def fmt_num(x, digits=4):
 	return f"{x:.{digits}f}"
 
 
-def solve_for_eps(eps, z_star, vehicles, c, a, last_routes, n):
+def build_model(vehicles, c, bits, last_routes, n):
+	"""Build the sweep MIP once; only the budget RHS changes per eps."""
 	p = c
 	M = max(p)
+	c_arr = np.asarray(c, dtype=np.float64)
+	nR = len(c)
 
 	model = gp.Model("cvrp_last_customer")
 	model.Params.OutputFlag = 0
-
-	R = range(len(c))
-	x = model.addVars(len(c), vtype=GRB.BINARY, name="x")
+	model.Params.Threads = THREADS
+	model.Params.MIPFocus = 1
+	model.Params.Presolve = 2
+	model.Params.NodeMethod = 2
+	model.Params.LPWarmStart = 2
+
+	x = model.addMVar(nR, vtype=GRB.BINARY, name="x")
+	xs = x.tolist()
 	gamma = model.addVar(lb=0.0, vtype=GRB.CONTINUOUS, name="gamma")
 	eta = model.addVar(lb=0.0, vtype=GRB.CONTINUOUS, name="eta")
 
-	for i in range(1, n + 1):
-		model.addConstr(gp.quicksum(x[r] for r in a[i]) == 1)
+	# All n partition rows go to the solver in one matrix constraint
+	rows, cols = np.nonzero(bits)
+	A = csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, nR))
+	model.addConstr(A @ x == np.ones(n))
 
-	model.addConstr(gp.quicksum(c[r] * x[r] for r in R) <= (1.0 + eps) * z_star)
-	model.addConstr(gp.quicksum(x[r] for r in R) == vehicles)
+	# RHS is a placeholder; solve_for_eps sets it before each optimize
+	budget = gp.LinExpr()
+	budget.addTerms(c_arr.tolist(), xs)
+	c_budget = model.addConstr(budget <= 0.0, name="budget")
+	model.addConstr(x.sum() == vehicles)
 
 	for i in range(1, n + 1):
-		model.addConstr(gp.quicksum(p[r] * x[r] for r in last_routes[i]) <= eta)
-		model.addConstr(
-			M * (1 - gp.quicksum(x[r] for r in last_routes[i]))
-			+ gp.quicksum(p[r] * x[r] for r in last_routes[i])
-			>= gamma
-		)
+		sel = last_routes[i]
+		pay_i = gp.LinExpr()
+		pay_i.addTerms([float(p[r]) for r in sel], [xs[r] for r in sel])
+		cnt_i = gp.quicksum(xs[r] for r in sel)
+		model.addConstr(pay_i <= eta)
+		model.addConstr(M * (1 - cnt_i) + pay_i >= gamma)
 
 	model.setObjective(eta - gamma, GRB.MINIMIZE)
+	return model, x, c_budget
+
+
+def solve_for_eps(model, x, c_budget, eps, z_star, c):
+	c_budget.RHS = (1.0 + eps) * z_star
 	model.optimize()
 
 	runtime = float(getattr(model, "Runtime", float("nan")))
@@ -79,11 +104,10 @@ def solve_for_eps(eps, z_star, vehicles, c, a, last_routes, n):
 	route_range = float("nan")
 
 	if model.SolCount > 0:
-		chosen = [r for r in R if x[r].X > 0.5]
-		chosen_dist = [c[r] for r in chosen]
-		total_cost = float(sum(chosen_dist))
-		if chosen_dist:
-			route_range = float(max(chosen_dist) - min(chosen_dist))
+		chosen_dist = np.asarray(c, dtype=np.float64)[x.X > 0.5]
+		total_cost = float(chosen_dist.sum())
+		if chosen_dist.size:
+			route_range = float(chosen_dist.max() - chosen_dist.min())
 
 	return runtime, gap, total_cost, route_range
 
@@ -96,27 +120,29 @@ def main():
 	capacity, demands = read_instance("instance.txt")
 	n = len(demands)
 
-	c, route_customers, last_customer = read_routes("routes.txt", n)
+	c, masks, last_customer = read_routes("routes.txt", n)
 	R = range(len(c))
 
-	a = [[] for _ in range(n + 1)]
-	for r in R:
-		for i in route_customers[r]:
-			a[i].append(r)
+	# One broadcasted shift yields the whole customer-route membership
+	# matrix, which doubles as the set-partition incidence matrix
+	bits = (masks[None, :] >> np.arange(1, n + 1, dtype=np.uint64)[:, None]) & np.uint64(1)
 
-	for i in range(1, n + 1):
-		if not a[i]:
-			raise ValueError(f"Customer {i} is not covered by any route")
+	uncovered = np.where(bits.sum(axis=1) == 0)[0]
+	if uncovered.size:
+		raise ValueError(f"Customer {int(uncovered[0]) + 1} is not covered by any route")
 
 	last_routes = [[] for _ in range(n + 1)]
 	for r in R:
 		i_last = last_customer[r]
 		last_routes[i_last].append(r)
 
+	# One model for the whole sweep: each eps only relaxes the budget RHS,
+	# so the solver restarts from the previous (still feasible) solution
+	model, x, c_budget = build_model(vehicles, c, bits, last_routes, n)
+
 	for eps in eps_list:
 		runtime, gap, total_cost, route_range = solve_for_eps(
-			eps, z_star, vehicles, c, a, last_routes, n
-		)
+			model, x, c_budget, eps, z_star, c)
 
 		print(
 			"eps="